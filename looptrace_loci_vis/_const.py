@@ -1,9 +1,20 @@
 """Plugin-wide constants"""
 
-from enum import Enum
+from enum import Enum, IntEnum
 
 
 class PointColor(Enum):
     # See: https://davidmathlogic.com/colorblind/
     DEEP_SKY_BLUE = "#0C7BDC"
     GOLDENROD = "#FFC20A"
+
+
+class InputFileColumn(IntEnum):
+    """Indices of the different columns to parse as particular fields, from a headless points file"""
+
+    TRACE = 0
+    TIMEPOINT = 1
+    Z = 2
+    Y = 3
+    X = 4
+    QC = 5
@@ -2,16 +2,27 @@
 
 from collections.abc import Callable
 from pathlib import Path
-from typing import Literal, Union
+from typing import Literal, Protocol, Union
 
+import numpy as np
+import numpy.typing as npt
 from gertils.geometry import ZCoordinate
 from gertils.types import PixelArray
 
-CsvRow = list[str]
 FlatPointRecord = list[Union[float, ZCoordinate]]
 LayerParams = dict[str, object]
-ImageLayer = tuple[PixelArray, LayerParams, Literal["image"]]
-PointsLayer = tuple[list[FlatPointRecord], LayerParams, Literal["points"]]
+
+
+class ChunkedArray(Protocol):
+    """Array read from storage only as it's indexed, as a ZARR array of either zarr version is"""
+
+    @property
+    def shape(self) -> tuple[int, ...]: ...
+
+
+ImageData = PixelArray | ChunkedArray
+ImageLayer = tuple[ImageData, LayerParams, Literal["image"]]
+PointsLayer = tuple[npt.NDArray[np.float32], LayerParams, Literal["points"]]
 PathLike = str | Path
 PathOrPaths = PathLike | list[PathLike]
 QCFailReasons = str
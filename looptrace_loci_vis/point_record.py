@@ -1,10 +1,12 @@
 """A single point's record in a file on disk."""
 
 import dataclasses
+from collections.abc import Iterator
 from math import floor
 from typing import Union
 
 import numpy as np
+import numpy.typing as npt
 from gertils.geometry import ImagePoint3D, LocatableXY, LocatableZ, ZCoordinate
 from gertils.types import TimepointFrom0 as Timepoint
 from gertils.types import TraceIdFrom0 as TraceId
@@ -12,6 +14,9 @@ from numpydoc_decorator import doc  # type: ignore[import-untyped]
 
 from ._types import FlatPointRecord
 
+# Single precision has a 24-bit significand, so represents every integer only up to this one.
+_MAX_EXACT_FLOAT32_INT = 2**24
+
 
 @doc(
     summary="",
@@ -28,6 +33,9 @@ class PointRecord(LocatableXY, LocatableZ):  # noqa: D101
     point: ImagePoint3D
 
     def __post_init__(self) -> None:
+        # Type checks are skipped under optimisation (-O), as records are built from typed columns.
+        if not __debug__:
+            return
         bads: dict[str, object] = {}
         if not isinstance(self.trace_id, TraceId):
             bads["trace ID"] = self.trace_id  # type: ignore[unreachable]
@@ -74,6 +82,84 @@ class PointRecord(LocatableXY, LocatableZ):  # noqa: D101
         return dataclasses.replace(self, point=pt)
 
 
+@doc(
+    summary="Point records stored column-wise, as one array per field",
+    parameters=dict(
+        trace_id="ID of the trace with which each locus spot is associated",
+        timepoint="Imaging timepoint from which each point is coming",
+        z="z-coordinate of each point's Gaussian fit centroid",
+        y="y-coordinate of each point's Gaussian fit centroid",
+        x="x-coordinate of each point's Gaussian fit centroid",
+    ),
+)
+# Equality and hashing over array fields would be ambiguous or fail, so keep identity semantics.
+@dataclasses.dataclass(frozen=True, kw_only=True, eq=False)
+class PointRecordsSoA:  # noqa: D101
+    trace_id: npt.NDArray[np.int64]
+    timepoint: npt.NDArray[np.int64]
+    z: npt.NDArray[np.float64]
+    y: npt.NDArray[np.float64]
+    x: npt.NDArray[np.float64]
+
+    def __post_init__(self) -> None:
+        lengths = {name: len(getattr(self, name)) for name in self._field_names()}
+        if len(set(lengths.values())) > 1:
+            raise ValueError(f"Cannot create point records with unequal column lengths: {lengths}")
+        # Check once per column what wrapping each trace ID and timepoint would check per value.
+        for name in ("trace_id", "timepoint"):
+            if (getattr(self, name) < 0).any():
+                raise ValueError(f"Cannot create point records with negative {name}")
+
+    def __len__(self) -> int:
+        return len(self.trace_id)
+
+    def __iter__(self) -> Iterator[PointRecord]:
+        return (self.record_at(i) for i in range(len(self)))
+
+    def record_at(self, i: int) -> PointRecord:
+        """Wrap the values at the given index as a single record, for callers which need one."""
+        return PointRecord(
+            trace_id=TraceId(int(self.trace_id[i])),
+            timepoint=Timepoint(int(self.timepoint[i])),
+            point=ImagePoint3D(z=float(self.z[i]), y=float(self.y[i]), x=float(self.x[i])),
+        )
+
+    @classmethod
+    def _field_names(cls) -> list[str]:
+        return [f.name for f in dataclasses.fields(cls)]
+
+    @doc(summary="Flatten")
+    def flatten(self) -> list[FlatPointRecord]:
+        """Create a simple list of components for each record, at full precision."""
+        rows: list[FlatPointRecord] = np.column_stack(
+            [self.trace_id, self.timepoint, self.z, self.y, self.x]
+        ).tolist()
+        return rows
+
+    @doc(
+        summary="Stack the columns as napari points layer data",
+        returns="""
+            Single-precision array (as napari renders), with one row per record,
+            and a column for each of trace, timepoint, z, y, x
+        """,
+        raises=dict(
+            ValueError="If a trace ID or timepoint is too large to be exact in single precision"
+        ),
+    )
+    def as_layer_array(self) -> npt.NDArray[np.float32]:  # noqa: D102
+        for name in ("trace_id", "timepoint"):
+            ids = getattr(self, name)
+            if len(ids) != 0 and ids.max() > _MAX_EXACT_FLOAT32_INT:
+                raise ValueError(
+                    f"Cannot represent {name} {ids.max()} exactly in single precision; max is {_MAX_EXACT_FLOAT32_INT}"
+                )
+        columns = (self.trace_id, self.timepoint, self.z, self.y, self.x)
+        layer_data = np.empty((len(self), len(columns)), dtype=np.float32)
+        for j, col in enumerate(columns):
+            layer_data[:, j] = col
+        return layer_data
+
+
 @doc(
     summary="Create ancillary points from main point",
     parameters=dict(
@@ -116,3 +202,40 @@ def expand_along_z(  # noqa: D103
             f"Number of points generated from single spot center isn't as expected! Point={r}, z_max={z_max}, len(points)={len(points)}"
         )
     return points, params  # type: ignore[return-value]
+
+
+@doc(
+    summary="Create ancillary points from main points, for all records at once",
+    parameters=dict(records="The records to expand along z-axis"),
+    raises=dict(ValueError="If any record's z-coordinate is negative"),
+    returns="""
+        Records representing each original point along entire length of z-axis,
+        from 0 through the greatest truncated z among the records, each record's
+        points consecutive and in the original record order; flag for each row
+        indicating whether it's true center or not; and the number of z-slices,
+        i.e. of points for each original record
+    """,
+)
+def expand_all_along_z(  # noqa: D103
+    records: PointRecordsSoA,
+) -> tuple[PointRecordsSoA, npt.NDArray[np.bool_], int]:
+    if len(records) == 0:
+        return records, np.zeros(0, dtype=np.bool_), 0
+
+    z_centers = np.floor(records.z).astype(np.int64)
+    if z_centers.min() < 0:
+        raise ValueError(f"Cannot expand along z with negative z-coordinate: {records.z.min()}")
+
+    # Each record gives rise to one point per z-slice, numbering slices from 0.
+    num_slices = int(z_centers.max()) + 1
+    z_slices = np.arange(num_slices)
+    points = PointRecordsSoA(
+        trace_id=np.repeat(records.trace_id, num_slices),
+        timepoint=np.repeat(records.timepoint, num_slices),
+        z=np.tile(z_slices.astype(np.float64), len(records)),
+        y=np.repeat(records.y, num_slices),
+        x=np.repeat(records.x, num_slices),
+    )
+    # Broadcast (records x slices) comparison, rather than materialising tiled and repeated copies.
+    center_flags = (z_slices[np.newaxis, :] == z_centers[:, np.newaxis]).ravel()
+    return points, center_flags, num_slices
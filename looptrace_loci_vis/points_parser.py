@@ -1,30 +1,21 @@
 """Abstractions related to points parsing"""
 
 import abc
-import csv
-from collections.abc import Iterable, Sized
-from enum import Enum
-from typing import Generic, Protocol, TypeVar
+import functools
+from collections.abc import Callable, Hashable, Mapping
+from pathlib import Path
+from typing import ClassVar, Generic, Protocol, TypeVar
 
+import numpy as np
+import numpy.typing as npt
 import pandas as pd
-from gertils.geometry import ImagePoint3D
-from gertils.types import TimepointFrom0 as Timepoint
-from gertils.types import TraceIdFrom0 as TraceId
 
-from ._types import CsvRow, PathLike, QCFailReasons
-from .point_record import PointRecord
+from ._const import InputFileColumn
+from ._types import PathLike, QCFailReasons
+from .point_record import PointRecordsSoA
 
 Input = TypeVar("Input", contravariant=True)
-I1 = TypeVar("I1")
-I2 = TypeVar("I2", bound=Sized)
-
-
-class MappingLike(Protocol, Sized):  # noqa: D101
-    @abc.abstractmethod
-    def __getitem__(self, key: str) -> object: ...
-
-    @abc.abstractmethod
-    def __len__(self) -> int: ...
+Scalar = TypeVar("Scalar", np.int64, np.float64)
 
 
 class PointsParser(Protocol, Generic[Input]):
@@ -32,113 +23,214 @@ class PointsParser(Protocol, Generic[Input]):
 
     @classmethod
     @abc.abstractmethod
-    def parse_all_qcpass(cls, data: Input) -> list[PointRecord]: ...  # noqa: D102
+    def parse_all_qcpass(cls, data: Input) -> PointRecordsSoA: ...  # noqa: D102
 
     @classmethod
     @abc.abstractmethod
-    def parse_all_qcfail(cls, data: Input) -> list[tuple[PointRecord, QCFailReasons]]: ...  # noqa: D102
-
+    def parse_all_qcfail(  # noqa: D102
+        cls, data: Input
+    ) -> tuple[PointRecordsSoA, list[QCFailReasons]]: ...
 
-class IterativePointsParser(Generic[I1, I2], PointsParser[I1]):
-    """Something that yields records, each of type I2 from value of type I1, to parse QC-pass/-fail points"""
 
-    @classmethod
-    @abc.abstractmethod
-    def _gen_records(cls, data: I1) -> Iterable[I2]: ...
+class HeadedTraceTimePointParser(PointsParser[PathLike]):
+    """Something capable of parsing a headed CSV of QC-pass/-fail points records"""
 
-    @classmethod
-    @abc.abstractmethod
-    def _parse_single_qcpass_record(cls, record: I2) -> PointRecord: ...
+    TRACE_INDEX_COLUMN = "traceIndex"
+    TIME_INDEX_COLUMN = "timeIndex"
+    FAIL_CODE_COLUMN = "failCode"
+
+    _qcpass_columns = (TRACE_INDEX_COLUMN, TIME_INDEX_COLUMN, "z", "y", "x")
+    _qcfail_columns = (*_qcpass_columns, FAIL_CODE_COLUMN)
+    _column_dtypes: ClassVar[Mapping[str, str | type[np.int64] | type[np.float64]]] = {
+        TRACE_INDEX_COLUMN: np.int64,
+        TIME_INDEX_COLUMN: np.int64,
+        "z": np.float64,
+        "y": np.float64,
+        "x": np.float64,
+        FAIL_CODE_COLUMN: "string",
+    }
 
     @classmethod
-    @abc.abstractmethod
-    def _parse_single_qcfail_record(cls, record: I2) -> tuple[PointRecord, QCFailReasons]: ...
+    def parse_all_qcpass(cls, data: PathLike) -> PointRecordsSoA:  # noqa: D102
+        return cls._records_from_table(_load_cached(data, cls._read_qcpass_table))
 
     @classmethod
-    def parse_all_qcpass(cls, data: I1) -> list[PointRecord]:  # noqa: D102
-        return [cls._parse_single_qcpass_record(r) for r in cls._gen_records(data)]
+    def parse_all_qcfail(cls, data: PathLike) -> tuple[PointRecordsSoA, list[QCFailReasons]]:
+        """A fail record parses the same as a pass one, just with one additional field for QC fail reasons."""
+        table = _load_cached(data, cls._read_qcfail_table)
+        fail_codes = table[cls.FAIL_CODE_COLUMN]
+        num_missing = int(fail_codes.isna().sum())
+        if num_missing != 0:
+            raise TypeError(f"{cls.FAIL_CODE_COLUMN} is not str for {num_missing} record(s)")
+        return cls._records_from_table(table), fail_codes.tolist()
 
     @classmethod
-    def parse_all_qcfail(cls, data: I1) -> list[tuple[PointRecord, QCFailReasons]]:  # noqa: D102
-        return [cls._parse_single_qcfail_record(r) for r in cls._gen_records(data)]
-
-
-class HeadedTraceTimePointParser(IterativePointsParser[PathLike, MappingLike]):
-    """Something capable of parsing a headed CSV of QC-pass/-fail points records"""
-
-    TIME_INDEX_COLUMN = "timeIndex"
+    def _read_qcpass_table(cls, data: PathLike) -> pd.DataFrame:
+        return cls._read_table(data, columns=cls._qcpass_columns)
 
     @classmethod
-    def _gen_records(cls, data: PathLike) -> Iterable[MappingLike]:
-        for _, row in pd.read_csv(data).iterrows():
-            yield row
+    def _read_qcfail_table(cls, data: PathLike) -> pd.DataFrame:
+        return cls._read_table(data, columns=cls._qcfail_columns)
 
     @classmethod
-    def _parse_single_qcpass_record(cls, record: MappingLike) -> PointRecord:
-        trace = TraceId(int(record["traceIndex"]))  # type: ignore[call-overload]
-        timepoint = Timepoint(int(record[cls.TIME_INDEX_COLUMN]))  # type: ignore[call-overload]
-        z = float(record["z"])  # type: ignore[arg-type]
-        y = float(record["y"])  # type: ignore[arg-type]
-        x = float(record["x"])  # type: ignore[arg-type]
-        point = ImagePoint3D(z=z, y=y, x=x)
-        return PointRecord(trace_id=trace, timepoint=timepoint, point=point)
+    def _read_table(cls, data: PathLike, *, columns: tuple[str, ...]) -> pd.DataFrame:
+        """Parse just the needed columns of the whole file at once, with types given up front rather than inferred."""
+        return pd.read_csv(
+            data,
+            usecols=list(columns),
+            dtype=cls._column_dtypes,
+            engine="c",
+            memory_map=True,
+        )
 
     @classmethod
-    def _parse_single_qcfail_record(cls, record: MappingLike) -> tuple[PointRecord, QCFailReasons]:
-        """A fail record parses the same as a pass one, just with one additional field for QC fail reasons."""
-        pt_rec = cls._parse_single_qcpass_record(record)
-        fail_code = record["failCode"]
-        if not isinstance(fail_code, str):
-            raise TypeError(f"failCode is not str, but {type(fail_code).__name__}")
-        fail_code: str = str(fail_code)  # type: ignore[no-redef]
-        return pt_rec, fail_code
-
-
-class HeadlessTraceTimePointParser(IterativePointsParser[PathLike, CsvRow]):
+    def _records_from_table(cls, table: pd.DataFrame) -> PointRecordsSoA:
+        return _records_from_columns(
+            table,
+            trace=cls.TRACE_INDEX_COLUMN,
+            timepoint=cls.TIME_INDEX_COLUMN,
+            z="z",
+            y="y",
+            x="x",
+        )
+
+
+class HeadlessTraceTimePointParser(PointsParser[PathLike]):
     """Parser for input file with no header, and field for trace ID and timepoint in addition to coordinates"""
 
-    class InputFileColumn(Enum):
-        """Indices of the different columns to parse as particular fields"""
+    _number_of_columns = len(InputFileColumn)
 
-        TRACE = 0
-        TIMEPOINT = 1
-        Z = 2
-        Y = 3
-        X = 4
-        QC = 5
+    @classmethod
+    def parse_all_qcpass(cls, data: PathLike) -> PointRecordsSoA:  # noqa: D102
+        table = _load_cached(data, cls._read_table)
+        cls._check_number_of_columns(data, table, exp_num_columns=cls._number_of_columns - 1)
+        return cls._records_from_table(table)
 
-        @property
-        def get(self) -> int:
-            """Alias for the value of this enum member"""
-            return self.value
+    @classmethod
+    def parse_all_qcfail(  # noqa: D102
+        cls, data: PathLike
+    ) -> tuple[PointRecordsSoA, list[QCFailReasons]]:
+        table = _load_cached(data, cls._read_table)
+        cls._check_number_of_columns(data, table, exp_num_columns=cls._number_of_columns)
+        return cls._records_from_table(table), table[InputFileColumn.QC].tolist()
 
-    _number_of_columns = sum(1 for _ in InputFileColumn)
+    @classmethod
+    def _read_table(cls, data: PathLike) -> pd.DataFrame:
+        """Parse the whole file at once with the C engine."""
+        # An empty file can't be memory-mapped, so it'd fail before pandas could report it as empty.
+        if Path(data).stat().st_size == 0:
+            return cls._empty_table()
+        cls._check_fields_per_line(data)
+        try:
+            return pd.read_csv(
+                data,
+                header=None,
+                dtype={
+                    InputFileColumn.TRACE: np.int64,
+                    InputFileColumn.TIMEPOINT: np.int64,
+                    InputFileColumn.Z: np.float64,
+                    InputFileColumn.Y: np.float64,
+                    InputFileColumn.X: np.float64,
+                    InputFileColumn.QC: str,
+                },
+                na_filter=False,
+                engine="c",
+                memory_map=True,
+            )
+        except pd.errors.EmptyDataError:
+            return cls._empty_table()
 
     @classmethod
-    def _parse_single_record(cls, r: CsvRow, *, exp_len: int) -> PointRecord:
-        if not isinstance(r, list):
-            raise TypeError(f"Record to parse must be list, not {type(r).__name__}")
-        if len(r) != exp_len:
-            raise ValueError(f"Expected record of length {exp_len} but got {len(r)}: {r}")
-        trace = TraceId(int(r[cls.InputFileColumn.TRACE.get]))
-        timepoint = Timepoint(int(r[cls.InputFileColumn.TIMEPOINT.get]))
-        z = float(r[cls.InputFileColumn.Z.get])
-        y = float(r[cls.InputFileColumn.Y.get])
-        x = float(r[cls.InputFileColumn.X.get])
-        point = ImagePoint3D(z=z, y=y, x=x)
-        return PointRecord(trace_id=trace, timepoint=timepoint, point=point)
+    def _empty_table(cls) -> pd.DataFrame:
+        return pd.DataFrame(columns=range(cls._number_of_columns))
 
     @classmethod
-    def _gen_records(cls, data: PathLike) -> Iterable[CsvRow]:
-        with open(data, newline="") as fh:  # noqa: PTH123
-            return list(csv.reader(fh))
+    def _check_fields_per_line(cls, data: PathLike) -> None:
+        """Check that every line has as many fields as the first, since pandas would pad a short row."""
+        content = np.fromfile(data, dtype=np.uint8)
+        line_ends = np.flatnonzero(content == ord("\n"))
+        if content[-1] != ord("\n"):
+            line_ends = np.append(line_ends, len(content))
+        line_starts = np.concatenate(([0], line_ends[:-1] + 1))
+        # Fields aren't quoted in these files, so each comma delimits.
+        delimiters = np.flatnonzero(content == ord(","))
+        fields_per_line = (
+            np.searchsorted(delimiters, line_ends) - np.searchsorted(delimiters, line_starts) + 1
+        )
+        # Skip blank lines (allowing for a carriage return), as pandas does.
+        line_lengths = line_ends - line_starts
+        ends_with_cr = (line_lengths > 0) & (content[np.maximum(line_ends - 1, 0)] == ord("\r"))
+        fields_per_line = fields_per_line[line_lengths > ends_with_cr]
+        bad_lines = np.flatnonzero(fields_per_line != fields_per_line[:1])
+        if len(bad_lines) != 0:
+            raise ValueError(
+                f"Expected records of length {fields_per_line[0]} but got {fields_per_line[bad_lines[0]]} for record {bad_lines[0] + 1}: {data}"
+            )
 
     @classmethod
-    def _parse_single_qcpass_record(cls, record: CsvRow) -> PointRecord:
-        return cls._parse_single_record(record, exp_len=cls._number_of_columns - 1)
+    def _check_number_of_columns(
+        cls, data: PathLike, table: pd.DataFrame, *, exp_num_columns: int
+    ) -> None:
+        """Check the field count once for the whole table, rather than per row; each line's count was checked on reading."""
+        if len(table) != 0 and table.shape[1] != exp_num_columns:
+            raise ValueError(
+                f"Expected records of length {exp_num_columns} but got {table.shape[1]}: {data}"
+            )
 
     @classmethod
-    def _parse_single_qcfail_record(cls, record: CsvRow) -> tuple[PointRecord, QCFailReasons]:
-        pt_rec = cls._parse_single_record(record, exp_len=cls._number_of_columns)
-        fail_code = record[cls.InputFileColumn.QC.get]
-        return pt_rec, fail_code
+    def _records_from_table(cls, table: pd.DataFrame) -> PointRecordsSoA:
+        return _records_from_columns(
+            table,
+            trace=InputFileColumn.TRACE,
+            timepoint=InputFileColumn.TIMEPOINT,
+            z=InputFileColumn.Z,
+            y=InputFileColumn.Y,
+            x=InputFileColumn.X,
+        )
+
+
+def _records_from_columns(
+    table: pd.DataFrame,
+    *,
+    trace: Hashable,
+    timepoint: Hashable,
+    z: Hashable,
+    y: Hashable,
+    x: Hashable,
+) -> PointRecordsSoA:
+    """Take each field's values straight from the table's columns, without wrapping each value."""
+    return PointRecordsSoA(
+        trace_id=_read_only_column(table, trace, dtype=np.int64),
+        timepoint=_read_only_column(table, timepoint, dtype=np.int64),
+        z=_read_only_column(table, z, dtype=np.float64),
+        y=_read_only_column(table, y, dtype=np.float64),
+        x=_read_only_column(table, x, dtype=np.float64),
+    )
+
+
+def _read_only_column(
+    table: pd.DataFrame, column: Hashable, *, dtype: type[Scalar]
+) -> npt.NDArray[Scalar]:
+    """The array may be a view into a cached table, so guard the cache against in-place changes."""
+    values: npt.NDArray[Scalar] = table[column].to_numpy(dtype=dtype)
+    values.flags.writeable = False
+    return values
+
+
+def _load_cached(path: PathLike, read_table: Callable[[PathLike], pd.DataFrame]) -> pd.DataFrame:
+    """Read a table from the given path, reusing the previous parse if the file's unchanged since."""
+    fp = Path(path).resolve()
+    stat = fp.stat()
+    return _read_table_for_file_state(fp, stat.st_mtime_ns, stat.st_size, read_table)
+
+
+# One QC-pass and one QC-fail file per field of view, so keep just the tables of the one last read.
+@functools.lru_cache(maxsize=2)
+def _read_table_for_file_state(
+    path: Path,
+    mtime_ns: int,  # noqa: ARG001
+    size: int,  # noqa: ARG001
+    read_table: Callable[[PathLike], pd.DataFrame],
+) -> pd.DataFrame:
+    """Modification time and size aren't used directly but key the cache, so a changed file is reparsed."""
+    return read_table(path)
@@ -2,10 +2,15 @@
 
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 from pathlib import Path
 from typing import Optional
 
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+import zarr
 from gertils.pathtools import find_multiple_paths_by_fov, get_fov_sort_key
 from gertils.types import FieldOfViewFrom1
 from gertils.zarr_tools import read_zarr
@@ -13,6 +18,7 @@ from numpydoc_decorator import doc  # type: ignore[import-untyped]
 
 from ._const import PointColor
 from ._types import (
+    ImageData,
     ImageLayer,
     LayerParams,
     PathLike,
@@ -21,7 +27,7 @@ from ._types import (
     QCFailReasons,
     Reader,
 )
-from .point_record import PointRecord, expand_along_z
+from .point_record import PointRecordsSoA, expand_all_along_z
 from .points_parser import HeadedTraceTimePointParser, HeadlessTraceTimePointParser, PointsParser
 
 
@@ -34,10 +40,8 @@ class QCStatus(Enum):
     @classmethod
     def from_csv_name(cls, fn: str) -> Optional["QCStatus"]:
         """Try to determine CSV status from given name of CSV file."""
-        for qc in cls:
-            if fn.endswith(qc.filename_extension):
-                return qc
-        return None
+        # Each extension begins with the last occurrence of ".qc" in a name which ends with it.
+        return _STATUS_BY_FILENAME_EXTENSION.get(fn[fn.rfind(".qc") :])
 
     @classmethod
     def from_csv_path(cls, fp: PathLike) -> Optional["QCStatus"]:
@@ -49,6 +53,26 @@ class QCStatus(Enum):
         return f".qc{self.value}.csv"
 
 
+_STATUS_BY_FILENAME_EXTENSION = {qc.filename_extension: qc for qc in QCStatus}
+_FOV_FILE_EXTENSIONS = (".zarr", *_STATUS_BY_FILENAME_EXTENSION)
+# Array metadata of ZARR format v2, and array or group metadata of v3
+_ZARR_METADATA_FILENAMES = (".zarray", "zarr.json")
+
+# Points layer parameters which don't depend on the file's content, built once rather than per read
+_STATIC_POINTS_LAYER_PARAMS: LayerParams = {
+    "edge_width": 0.1,
+    "edge_width_is_relative": True,
+    "n_dimensional": False,
+}
+_COLOR_PARAMS_BY_STATUS: dict[QCStatus, LayerParams] = {
+    qc: {"edge_color": color.value, "face_color": color.value}
+    for qc, color in (
+        (QCStatus.PASS, PointColor.GOLDENROD),
+        (QCStatus.FAIL, PointColor.DEEP_SKY_BLUE),
+    )
+}
+
+
 @doc(
     summary="Read and display locus-specific spots from looptrace.",
     parameters=dict(path="Path from which to parse layers"),
@@ -62,7 +86,7 @@ def get_reader(path: PathOrPaths) -> Optional[Reader]:  # noqa: D103
         _do_not_parse(path=path, why="Not a folder/directory")
         return None
     path_by_fov: dict[FieldOfViewFrom1, list[Path]] = find_multiple_paths_by_fov(
-        path, extensions=(".zarr", *(qc.filename_extension for qc in QCStatus))
+        path, extensions=_FOV_FILE_EXTENSIONS
     )
     if len(path_by_fov) != 1:
         _do_not_parse(
@@ -88,7 +112,8 @@ def get_reader(path: PathOrPaths) -> Optional[Reader]:  # noqa: D103
         return None
     if len(path_by_status) != 0:
         raise RuntimeError(f"Extra QC status/path pairs! {path_by_status}")
-    left_to_match = [f for f in files if f not in [fail_path, pass_path]]
+    qc_paths = {fail_path, pass_path}
+    left_to_match = [f for f in files if f not in qc_paths]
     if len(left_to_match) != 1:
         raise RuntimeError(
             f"Nonsense! After finding 2 QC files among 3 files of interest, only 1 should remain but got {len(left_to_match)}: {left_to_match}"
@@ -102,24 +127,25 @@ def get_reader(path: PathOrPaths) -> Optional[Reader]:  # noqa: D103
         return None
 
     def parse(_):  # type: ignore[no-untyped-def] # noqa: ANN202 ANN001
-        image_layer: ImageLayer = (read_zarr(potential_zarr), {}, "image")
-        failures_layer: PointsLayer = build_single_file_points_layer(fail_path)
-        successes_layer: PointsLayer = build_single_file_points_layer(pass_path)
+        # The three reads are independent, and largely I/O or GIL-releasing decompression/parsing.
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            image_future = pool.submit(_open_image_lazily, potential_zarr)
+            failures_future = pool.submit(
+                build_single_file_points_layer, fail_path, qc=QCStatus.FAIL
+            )
+            successes_future = pool.submit(
+                build_single_file_points_layer, pass_path, qc=QCStatus.PASS
+            )
+            image_layer: ImageLayer = (image_future.result(), {}, "image")
+            failures_layer: PointsLayer = failures_future.result()
+            successes_layer: PointsLayer = successes_future.result()
         return [image_layer, failures_layer, successes_layer]
 
     return parse
 
 
-def build_single_file_points_layer(path: PathLike) -> PointsLayer:
-    """Build the parser for a single file (ZARR or CSV relevant for locus points viewing)."""
-    static_params = {
-        "edge_width": 0.1,
-        "edge_width_is_relative": True,
-        "n_dimensional": False,
-    }
-
-    qc = QCStatus.from_csv_path(path)
-
+def build_single_file_points_layer(path: PathLike, *, qc: QCStatus) -> PointsLayer:
+    """Build the layer for a single points CSV file, whose QC status has already been inferred from its name."""
     # Determine how to read and display the points layer to be parsed.
     # First, determine the parsing strategy based on file header.
     parser: PointsParser[PathLike]
@@ -129,64 +155,53 @@ def build_single_file_points_layer(path: PathLike) -> PointsLayer:
     else:
         logging.debug("Will parse as headless: %s", path)
         parser = HeadlessTraceTimePointParser
-    # Then, determine the functions to used based on inferred QC status.
+    # Then, determine the functions to used based on the given QC status.
     if qc == QCStatus.PASS:
         logging.debug("Will parse sas QC-pass: %s", path)
-        color = PointColor.GOLDENROD
         read_file = parser.parse_all_qcpass
         process_records = records_to_qcpass_layer_data
-    elif qc == QCStatus.FAIL:
+    else:
         logging.debug("Will parse as QC-fail: %s", path)
-        color = PointColor.DEEP_SKY_BLUE
         read_file = parser.parse_all_qcfail  # type: ignore[assignment]
         process_records = records_to_qcfail_layer_data  # type: ignore[assignment]
-    else:
-        _do_not_parse(path=path, why="Could not infer QC status", level=logging.ERROR)
-        raise ValueError(
-            f"Despite undertaking parse, file from which QC status could not be parsed was encountered: {path}"
-        )
 
-    # Use the information gleaned from filename and from file header to determine point color and to read data.
-    color_meta = {"edge_color": color.value, "face_color": color.value}
+    # Use the information gleaned from filename and from file header to read data.
     base_point_records = read_file(path)
     point_records, center_flags, extra_meta = process_records(base_point_records)
 
-    if not point_records:
+    if len(point_records) == 0:
         logging.warning("No data rows parsed!")
-    shape_meta = {"symbol": ["*" if is_center else "o" for is_center in center_flags]}
-    params = {**static_params, **color_meta, **extra_meta, **shape_meta}
+    params = {
+        **_STATIC_POINTS_LAYER_PARAMS,
+        **_COLOR_PARAMS_BY_STATUS[qc],
+        "symbol": np.where(center_flags, "*", "o"),
+        **extra_meta,
+    }
 
-    return [pt_rec.flatten() for pt_rec in point_records], params, "points"
+    return point_records.as_layer_array(), params, "points"
 
 
 def records_to_qcpass_layer_data(
-    records: list[PointRecord],
-) -> tuple[list[PointRecord], list[bool], LayerParams]:
+    records: PointRecordsSoA,
+) -> tuple[PointRecordsSoA, npt.NDArray[np.bool_], LayerParams]:
     """Extend the given records partially through a z-stack, designate appropriately as central-plane or not."""
-    max_z = max(r.get_z_coordinate() for r in records)
-    points: list[PointRecord] = []
-    center_flags: list[bool] = []
-    for rec in records:
-        new_points, new_flags = expand_along_z(rec, z_max=max_z)
-        points.extend(new_points)
-        center_flags.extend(new_flags)
-    sizes = [1.5 if is_center else 1.0 for is_center in center_flags]
+    points, center_flags, _ = expand_all_along_z(records)
+    sizes = np.where(center_flags, 1.5, 1.0)
     return points, center_flags, {"size": sizes}
 
 
 def records_to_qcfail_layer_data(
-    record_qc_pairs: list[tuple[PointRecord, QCFailReasons]],
-) -> tuple[list[PointRecord], list[bool], LayerParams]:
+    records_and_codes: tuple[PointRecordsSoA, list[QCFailReasons]],
+) -> tuple[PointRecordsSoA, npt.NDArray[np.bool_], LayerParams]:
     """Extend the given records partially through a z-stack, designate appropriately as central-plane or not; also set fail codes text."""
-    max_z = max(r.get_z_coordinate() for r, _ in record_qc_pairs)
-    points: list[PointRecord] = []
-    center_flags: list[bool] = []
-    codes: list[QCFailReasons] = []
-    for rec, qc in record_qc_pairs:
-        new_points, new_flags = expand_along_z(rec, z_max=max_z)
-        points.extend(new_points)
-        center_flags.extend(new_flags)
-        codes.extend([qc] * len(new_points))
+    records, fail_codes = records_and_codes
+    points, center_flags, num_slices = expand_all_along_z(records)
+    # Each record's expanded along z to the same number of slices, so repeat each code that many times.
+    # Few distinct fail codes recur across many points, so store each once and index into them.
+    record_codes = pd.Categorical(fail_codes)
+    codes = pd.Categorical.from_codes(
+        np.repeat(record_codes.codes, num_slices), categories=record_codes.categories
+    )
     params = {
         "size": 0,  # Make the point invisible and just use text.
         "text": {
@@ -208,6 +223,19 @@ def _do_not_parse(*, path: PathLike, why: str, level: int = logging.DEBUG) -> No
     )
 
 
+def _open_image_lazily(path: Path) -> ImageData:
+    """Open the image array without reading its pixels, so that napari loads chunks only as they're viewed."""
+    # The array is either directly in the ZARR, or in a single 0 subfolder of it.
+    for array_path in (path, path / "0"):
+        if any((array_path / fn).is_file() for fn in _ZARR_METADATA_FILENAMES):
+            opened = zarr.open(str(array_path), mode="r")
+            if isinstance(opened, zarr.Array):
+                return opened
+    logging.debug("No array found directly, reading with gertils: %s", path)
+    image: ImageData = read_zarr(path)
+    return image
+
+
 def _has_header(path: PathLike) -> bool:
     with open(path) as fh:  # noqa: PTH123
         header = fh.readline()
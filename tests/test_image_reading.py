@@ -0,0 +1,41 @@
+"""Tests for opening the image layer's data from a ZARR"""
+
+import numpy as np
+import pytest
+import zarr
+
+from looptrace_loci_vis import reader
+from looptrace_loci_vis.reader import _open_image_lazily
+
+IMAGE_SHAPE = (2, 3, 4)
+
+
+def _write_image(path):
+    image = np.arange(np.prod(IMAGE_SHAPE), dtype=np.uint16).reshape(IMAGE_SHAPE)
+    array = zarr.open_array(str(path), mode="w", shape=IMAGE_SHAPE, dtype=image.dtype)
+    array[:] = image
+    return image
+
+
+@pytest.mark.parametrize("subfolder", [None, "0"])
+def test_image_is_opened_lazily_from_either_layout(tmp_path, subfolder):
+    zarr_path = tmp_path / "P0001.zarr"
+    image = _write_image(zarr_path if subfolder is None else zarr_path / subfolder)
+    opened = _open_image_lazily(zarr_path)
+    assert isinstance(opened, zarr.Array)
+    assert np.array_equal(opened[:], image)
+
+
+def test_image_without_array_metadata_is_read_with_gertils(tmp_path, monkeypatch):
+    zarr_path = tmp_path / "P0001.zarr"
+    zarr_path.mkdir()
+    read_paths = []
+    image = np.zeros(IMAGE_SHAPE, dtype=np.uint16)
+
+    def read_zarr(path):
+        read_paths.append(path)
+        return image
+
+    monkeypatch.setattr(reader, "read_zarr", read_zarr)
+    assert _open_image_lazily(zarr_path) is image
+    assert read_paths == [zarr_path]
@@ -2,8 +2,24 @@
 
 from math import ceil
 
-from looptrace_loci_vis.points_parser import HeadlessTraceTimePointParser
-from looptrace_loci_vis.reader import records_to_qcfail_layer_data
+import numpy as np
+import pytest
+
+from looptrace_loci_vis.point_record import (
+    PointRecordsSoA,
+    expand_all_along_z,
+    expand_along_z,
+)
+from looptrace_loci_vis.points_parser import (
+    HeadedTraceTimePointParser,
+    HeadlessTraceTimePointParser,
+    _read_table_for_file_state,
+)
+from looptrace_loci_vis.reader import (
+    QCStatus,
+    build_single_file_points_layer,
+    records_to_qcfail_layer_data,
+)
 
 FAIL_LINES_SAMPLE = """0,13,5.880338307654485,12.20211975317036,10.728294496728491,S
 0,17,10.594366532607864,10.95875680073854,20.711938561802768,R S xy z
@@ -17,6 +33,12 @@ FAIL_LINES_SAMPLE = """0,13,5.880338307654485,12.20211975317036,10.7282944967284
 0,77,6.0415531254567885,13.910733825016758,10.238202728231837,S
 """
 
+HEADED_FAIL_LINES_SAMPLE = """fieldOfView,traceIndex,timeIndex,z,y,x,failCode
+P0001.zarr,0,13,5.880338307654485,12.20211975317036,10.728294496728491,S
+P0001.zarr,0,17,10.594366532607864,10.95875680073854,20.711938561802768,R S xy z
+P0001.zarr,1,47,10.198132167665957,14.398450914314138,15.378219719077295,3
+"""
+
 
 def test_failed_sample_line_count(tmp_path):
     lines = FAIL_LINES_SAMPLE.splitlines(keepends=True)
@@ -36,3 +58,136 @@ def test_failed_sample_line_count(tmp_path):
     assert (
         len(records) == exp_record_count
     ), f"Expected {exp_record_count} records but got {len(records)}"
+
+
+def test_expanding_all_records_matches_expanding_each_record(tmp_path):
+    data_file = tmp_path / "spots.qcfail.csv"
+    data_file.write_text(FAIL_LINES_SAMPLE)
+    records, _ = HeadlessTraceTimePointParser.parse_all_qcfail(data_file)
+    z_max = records.z.max()
+    exp_points = []
+    exp_flags = []
+    for rec in records:
+        new_points, new_flags = expand_along_z(rec, z_max=z_max)
+        exp_points.extend(p.flatten() for p in new_points)
+        exp_flags.extend(new_flags)
+    obs_points, obs_flags, obs_num_slices = expand_all_along_z(records)
+    assert obs_num_slices == int(z_max) + 1
+    assert obs_points.flatten() == exp_points
+    assert obs_flags.tolist() == exp_flags
+
+
+def test_headed_parse_reads_typed_columns_and_ignores_extra_columns(tmp_path):
+    data_file = tmp_path / "spots.qcpass.csv"
+    data_file.write_text(HEADED_FAIL_LINES_SAMPLE)
+    records = HeadedTraceTimePointParser.parse_all_qcpass(data_file)
+    assert records.trace_id.dtype == np.int64
+    assert records.timepoint.dtype == np.int64
+    assert records.z.dtype == np.float64
+    assert records.trace_id.tolist() == [0, 0, 1]
+    assert records.timepoint.tolist() == [13, 17, 47]
+    assert records.x.tolist() == [10.728294496728491, 20.711938561802768, 15.378219719077295]
+
+
+def test_headed_fail_codes_are_parsed_as_text_even_if_numeric(tmp_path):
+    data_file = tmp_path / "spots.qcfail.csv"
+    data_file.write_text(HEADED_FAIL_LINES_SAMPLE)
+    records, fail_codes = HeadedTraceTimePointParser.parse_all_qcfail(data_file)
+    assert len(records) == len(fail_codes)
+    assert fail_codes == ["S", "R S xy z", "3"]
+
+
+def test_headed_missing_fail_code_is_an_error(tmp_path):
+    data_file = tmp_path / "spots.qcfail.csv"
+    data_file.write_text(HEADED_FAIL_LINES_SAMPLE.replace(",S\n", ",\n"))
+    with pytest.raises(TypeError, match=r"failCode is not str for 1 record\(s\)"):
+        HeadedTraceTimePointParser.parse_all_qcfail(data_file)
+
+
+def test_unchanged_file_reuses_parse_and_changed_file_is_reparsed(tmp_path):
+    data_file = tmp_path / "spots.qcfail.csv"
+    data_file.write_text(FAIL_LINES_SAMPLE)
+    _read_table_for_file_state.cache_clear()
+    first, _ = HeadlessTraceTimePointParser.parse_all_qcfail(data_file)
+    second, _ = HeadlessTraceTimePointParser.parse_all_qcfail(data_file)
+    cache_info = _read_table_for_file_state.cache_info()
+    assert (cache_info.hits, cache_info.misses) == (1, 1)
+    assert second.flatten() == first.flatten()
+
+    first_line = FAIL_LINES_SAMPLE.splitlines(keepends=True)[0]
+    data_file.write_text(first_line)
+    records, fail_codes = HeadlessTraceTimePointParser.parse_all_qcfail(data_file)
+    cache_info = _read_table_for_file_state.cache_info()
+    assert (cache_info.hits, cache_info.misses) == (1, 2)
+    assert len(records) == 1
+    assert fail_codes == ["S"]
+
+
+def test_parsed_columns_cannot_modify_cached_parse(tmp_path):
+    data_file = tmp_path / "spots.qcfail.csv"
+    data_file.write_text(FAIL_LINES_SAMPLE)
+    records, _ = HeadlessTraceTimePointParser.parse_all_qcfail(data_file)
+    with pytest.raises(ValueError, match="read-only"):
+        records.z[0] = -1.0
+    assert HeadlessTraceTimePointParser.parse_all_qcfail(data_file)[0].z[0] == records.z[0]
+
+
+@pytest.mark.parametrize("qc", list(QCStatus))
+def test_empty_points_file_gives_empty_layer(tmp_path, caplog, qc):
+    data_file = tmp_path / f"P0001{qc.filename_extension}"
+    data_file.touch()
+    layer_data, _, layer_type = build_single_file_points_layer(data_file, qc=qc)
+    assert layer_type == "points"
+    assert layer_data.shape == (0, 5)
+    assert layer_data.dtype == np.float32
+    assert "No data rows parsed!" in caplog.text
+
+
+def test_headless_record_with_too_few_fields_is_an_error(tmp_path):
+    lines = FAIL_LINES_SAMPLE.splitlines(keepends=True)
+    short_line = lines[1].rsplit(",", 1)[0] + "\n"
+    data_file = tmp_path / "spots.qcfail.csv"
+    data_file.write_text("".join([lines[0], short_line, *lines[2:]]))
+    with pytest.raises(ValueError, match="Expected records of length 6 but got 5 for record 2"):
+        HeadlessTraceTimePointParser.parse_all_qcfail(data_file)
+
+
+def test_headless_wrong_field_count_names_the_file(tmp_path):
+    data_file = tmp_path / "spots.qcpass.csv"
+    data_file.write_text(FAIL_LINES_SAMPLE)
+    with pytest.raises(ValueError, match=f"length 5 but got 6: {data_file}"):
+        HeadlessTraceTimePointParser.parse_all_qcpass(data_file)
+
+
+def test_fail_codes_line_up_with_expanded_points(tmp_path):
+    data_file = tmp_path / "spots.qcfail.csv"
+    data_file.write_text(FAIL_LINES_SAMPLE)
+    records, fail_codes = HeadlessTraceTimePointParser.parse_all_qcfail(data_file)
+    points, _, params = records_to_qcfail_layer_data((records, fail_codes))
+    num_slices = ceil(records.z.max())
+    obs_codes = params["properties"]["failCodes"]
+    assert len(obs_codes) == len(points)
+    assert list(obs_codes) == [code for code in fail_codes for _ in range(num_slices)]
+    assert points.timepoint.tolist() == [t for t in records.timepoint for _ in range(num_slices)]
+
+
+def test_layer_array_is_single_precision_with_exact_ids(tmp_path):
+    data_file = tmp_path / "spots.qcfail.csv"
+    data_file.write_text(FAIL_LINES_SAMPLE)
+    records, _ = HeadlessTraceTimePointParser.parse_all_qcfail(data_file)
+    layer_data = records.as_layer_array()
+    assert layer_data.dtype == np.float32
+    assert layer_data[:, 1].tolist() == records.timepoint.tolist()
+
+
+def test_layer_array_rejects_trace_id_too_large_for_single_precision():
+    coordinates = np.zeros(1, dtype=np.float64)
+    records = PointRecordsSoA(
+        trace_id=np.array([2**24 + 1], dtype=np.int64),
+        timepoint=np.zeros(1, dtype=np.int64),
+        z=coordinates,
+        y=coordinates,
+        x=coordinates,
+    )
+    with pytest.raises(ValueError, match="Cannot represent trace_id 16777217 exactly"):
+        records.as_layer_array()
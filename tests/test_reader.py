@@ -0,0 +1,37 @@
+"""Tests for reading a field of view's folder into napari layers"""
+
+import shutil
+from math import floor
+from pathlib import Path
+
+import zarr
+
+import looptrace_loci_vis
+from looptrace_loci_vis.reader import QCStatus, get_reader
+
+EXAMPLES_FOLDER = Path(looptrace_loci_vis.__file__).parent / "examples"
+IMAGE_SHAPE = (2, 3, 4)
+
+
+def test_reader_gives_image_then_fail_then_pass_layer(tmp_path):
+    for qc in (QCStatus.FAIL, QCStatus.PASS):
+        shutil.copy(EXAMPLES_FOLDER / f"P0001{qc.filename_extension}", tmp_path)
+    image = zarr.open_array(str(tmp_path / "P0001.zarr"), mode="w", shape=IMAGE_SHAPE, dtype="u2")
+    image[:] = 1
+
+    read = get_reader(tmp_path)
+    assert read is not None
+    (
+        (image_data, _, image_kind),
+        (fail_data, fail_params, fail_kind),
+        (pass_data, pass_params, pass_kind),
+    ) = read(tmp_path)
+
+    assert (image_kind, fail_kind, pass_kind) == ("image", "points", "points")
+    assert image_data.shape == IMAGE_SHAPE
+    for qc, layer_data in ((QCStatus.FAIL, fail_data), (QCStatus.PASS, pass_data)):
+        lines = (EXAMPLES_FOLDER / f"P0001{qc.filename_extension}").read_text().splitlines()
+        num_slices = 1 + max(floor(float(line.split(",")[2])) for line in lines)
+        assert layer_data.shape == (len(lines) * num_slices, 5)
+    assert "failCodes" in fail_params["properties"]
+    assert "properties" not in pass_params